@@ -8,7 +8,7 @@ files in the script's directory.
 The https://github.com/google/der-ascii tools must be in the PATH.
 """
 
-import base64
+import binascii
 import subprocess
 import os
 
@@ -16,30 +16,64 @@ import os
 HEADER = "Generated by %s. Do not edit." % os.path.split(__file__)[1]
 
 
+# ascii2der converts its whole input in one go, so every queued block is
+# passed to a single invocation with this element between blocks. Its encoding
+# is then used to split the output back up.
+SEPARATOR_TEXT = '\nOCTET_STRING { `9f3b0c6a51e2d48775a0c1e3b6f24d19` }\n'
+SEPARATOR_DER = bytes.fromhex('04109f3b0c6a51e2d48775a0c1e3b6f24d19')
+
+# (path, dertext) pairs queued by Generate() and written out by Flush().
+PENDING = []
+
+# DER already produced for a block of text, so each distinct block is only
+# converted once.
+DER_CACHE = {}
+
+
 def Ascii2Der(txt):
   p = subprocess.Popen(['ascii2der'],
                         stdin=subprocess.PIPE,
                         stdout=subprocess.PIPE,
                         stderr=subprocess.PIPE)
-  stdout_data, stderr_data = p.communicate(txt)
+  stdout_data, stderr_data = p.communicate(txt.encode('utf-8'))
   if p.returncode:
-    raise RuntimeError('ascii2der returned %i: %s' % (p.returncode,
-                                                      stderr_data))
+    raise RuntimeError('ascii2der returned %i: %s' % (
+        p.returncode, stderr_data.decode('utf-8', 'replace')))
   return stdout_data
 
 
+def Ascii2DerBatch(texts):
+  missing = [txt for txt in dict.fromkeys(texts) if txt not in DER_CACHE]
+  if missing:
+    ders = Ascii2Der(SEPARATOR_TEXT.join(missing)).split(SEPARATOR_DER)
+    if len(ders) != len(missing):
+      raise RuntimeError('expected %i blocks from ascii2der, got %i' % (
+          len(missing), len(ders)))
+    DER_CACHE.update(zip(missing, ders))
+  return [DER_CACHE[txt] for txt in texts]
+
+
 def MakePemBlock(text, der, name):
-  b64 = base64.b64encode(der)
-  wrapped = '\n'.join(b64[pos:pos + 64] for pos in xrange(0, len(b64), 64))
+  # Every 48 bytes of DER encode to exactly one 64 column line of base64.
+  view = memoryview(der)
+  wrapped = b''.join(binascii.b2a_base64(view[pos:pos + 48])
+                     for pos in range(0, len(der), 48))
+  wrapped = wrapped.decode('ascii').rstrip('\n')
   return '%s\n\n%s\n-----BEGIN %s-----\n%s\n-----END %s-----' % (
       HEADER, text, name, wrapped, name)
 
 
 def Generate(path, dertext):
-  der = Ascii2Der(dertext)
-  data = MakePemBlock(dertext, der, 'AUTHORITY_KEY_IDENTIFIER')
-  with open(path, "w") as f:
-    f.write(data)
+  PENDING.append((path, dertext))
+
+
+def Flush():
+  ders = Ascii2DerBatch([dertext for _, dertext in PENDING])
+  for (path, dertext), der in zip(PENDING, ders):
+    data = MakePemBlock(dertext, der, 'AUTHORITY_KEY_IDENTIFIER')
+    with open(path, "wb") as f:
+      f.write(data.encode('utf-8'))
+  del PENDING[:]
 
 
 Generate('empty_sequence.pem', 'SEQUENCE {}')
@@ -178,3 +212,5 @@ Generate('extra_contents_after_extension_sequence.pem', """
   }
   INTEGER {`1234`}
 """)
+
+Flush()